@@ -1,96 +1,109 @@
+import functools
 import numpy as np
+import scipy.fft
 import cv2
 import matplotlib.pyplot as plt
 
+try:
+    import cupy as cp
+except ImportError:
+    cp = None
+
 class FromScratchFourier:
     def __init__(self):
         pass
     
     def dft2d(self, img):
-        """Discrete Fourier Transform in 2D - O(N^2 * M^2)"""
+        """Discrete Fourier Transform in 2D as matrix products F = Wm @ img @ Wn - O(M^2 * N + M * N^2)"""
         M, N = img.shape
-        freqs = np.zeros((M, N), dtype=np.complex128)
-        for u in range(M):
-            for v in range(N):
-                sum = 0
-                for x in range(M):
-                    for y in range(N):
-                        angle = -2j * np.pi * ((u * x / M) + (v * y / N))
-                        sum += img[x, y] * np.exp(angle)
-                freqs[u, v] = sum
-        return freqs
+        # Wm[u, x] = exp(-2j*pi*u*x/M) and Wn[y, v] = exp(-2j*pi*v*y/N), both symmetric
+        m = np.arange(M)
+        n = np.arange(N)
+        Wm = np.exp(-2j * np.pi * np.outer(m, m) / M)
+        Wn = np.exp(-2j * np.pi * np.outer(n, n) / N)
+        return Wm @ np.asarray(img, dtype=np.complex128) @ Wn
     
     def fft1d(self, x):
-        """Cooley-Tukey Fast Fourier Transform in 1D - O(N * log N)"""
-        N = len(x)
+        """Iterative radix-2 Cooley-Tukey FFT along the last axis - O(N * log N)"""
+        x = np.asarray(x, dtype=np.complex128)
+        N = x.shape[-1]
         if N <= 1:
-            return x
-        
-        even = self.fft1d(x[::2])
-        odd = self.fft1d(x[1::2])
+            return x.copy()
+        if N & (N - 1):
+            # radix-2 needs a power of two, other lengths use the direct O(N^2) DFT
+            n = np.arange(N)
+            return x @ np.exp(-2j * np.pi * np.outer(n, n) / N)
 
-        X = [0] * N
-        for k in range(N // 2):
-            twiddle_factor = np.exp(-2j * np.pi * k / N)
-            X[k] = even[k] + twiddle_factor * odd[k]
-            X[k + N // 2] = even[k] - twiddle_factor * odd[k]
+        # bit-reversal permutation puts the inputs of every size-2 butterfly next to each other
+        X = x[..., _bit_reversal(N)]
 
-        return X
-    
-    def fft2d(self, img):
-        """2D FFT by applying 1D FFT to rows then columns - O(MN * log MN)"""
-        # Apply 1D FFT on rows
-        fft_rows = [self.fft1d(row) for row in img]
-        fft_rows = np.array(fft_rows).T  # transpose
+        twiddle_factors = _twiddles(N)
+        # each stage merges pairs of size m/2 DFTs (even half, odd half) into size m DFTs
+        m = 2
+        while m <= N:
+            X = X.reshape(x.shape[:-1] + (N // m, m))
+            even = X[..., :m // 2]
+            odd = X[..., m // 2:] * twiddle_factors[::N // m]
+            X = np.concatenate([even + odd, even - odd], axis=-1)
+            m *= 2
 
-        # Apply 1D FFT on columns
-        fft_cols = [self.fft1d(col) for col in fft_rows]
-        return np.array(fft_cols).T  # transpose
+        return X.reshape(x.shape)
+    
+    def fft2d(self, img, educational=False):
+        """2D FFT - O(MN * log MN). Uses np.fft.fft2 (cuFFT for CuPy arrays) unless educational=True"""
+        if not educational:
+            return _backend(img).fft.fft2(img)
+        return self._fft2d_manual(img)
+    
+    def _fft2d_manual(self, img):
+        """2D FFT by applying the 1D FFT to all rows at once, then to all columns"""
+        fft_rows = self.fft1d(img)
+        return self.fft1d(fft_rows.T).T
     
     def low_pass_filter(self, img, cutoff=30):
         """Apply low-pass filter to keep only low frequencies"""
-        H, W = img.shape
-        Y, X = np.ogrid[:H, :W]
-        cy, cx = H // 2, W // 2
-        dist = np.sqrt((Y - cy)**2 + (X - cx)**2)
-        mask = dist < cutoff
-        
-        F = np.fft.fft2(img)
-        F_shifted = np.fft.fftshift(F)
-        F_filtered = F_shifted * mask
-        return np.fft.ifft2(np.fft.ifftshift(F_filtered)).real
+        return self._filter(img, "low", cutoff)
     
     def high_pass_filter(self, img, cutoff=30):
         """Apply high-pass filter to keep only high frequencies"""
-        H, W = img.shape
-        Y, X = np.ogrid[:H, :W]
-        cy, cx = H // 2, W // 2
-        dist = np.sqrt((Y - cy)**2 + (X - cx)**2)
-        mask = dist >= cutoff
-        
-        F = np.fft.fft2(img)
-        F_shifted = np.fft.fftshift(F)
-        F_filtered = F_shifted * mask
-        return np.fft.ifft2(np.fft.ifftshift(F_filtered)).real
+        return self._filter(img, "high", cutoff)
     
     def band_pass_filter(self, img, low=30, high=70):
         """Apply band-pass filter to keep only mid-range frequencies"""
-        H, W = img.shape
-        Y, X = np.ogrid[:H, :W]
-        cy, cx = H // 2, W // 2
-        dist = np.sqrt((Y - cy)**2 + (X - cx)**2)
-        mask = (dist > low) & (dist < high)
-        
-        F = np.fft.fft2(img)
-        F_shifted = np.fft.fftshift(F)
-        F_filtered = F_shifted * mask
-        return np.fft.ifft2(np.fft.ifftshift(F_filtered)).real
+        return self._filter(img, "band", low, high)
+    
+    def _filter(self, img, kind, *cutoffs):
+        """FFT, mask the spectrum in place, inverse FFT, all in single precision"""
+        if _backend(img) is not np:
+            return self._filter_gpu(img, kind, *cutoffs)
+        # scipy.fft keeps pocketfft plans cached between calls and splits the row/column passes over all cores
+        if np.isrealobj(img):
+            # a real image has a Hermitian spectrum, so the half spectrum from rfft2 is enough
+            F = scipy.fft.rfft2(np.asarray(img, dtype=np.float32), workers=-1)
+            F *= _frequency_mask(kind, img.shape, cutoffs, half=True)
+            # F is our own temporary, so the inverse may reuse its buffer
+            return scipy.fft.irfft2(F, s=img.shape, workers=-1, overwrite_x=True)
+        F = scipy.fft.fft2(np.asarray(img, dtype=np.complex64), workers=-1)
+        F *= _frequency_mask(kind, img.shape, cutoffs)
+        return scipy.fft.ifft2(F, workers=-1, overwrite_x=True).real
+    
+    def _filter_gpu(self, img, kind, *cutoffs):
+        """Same as _filter for a CuPy array: the spectrum never leaves the device, only the mask is uploaded"""
+        if not cp.iscomplexobj(img):
+            F = cp.fft.rfft2(img.astype(cp.float32, copy=False))
+            F *= cp.asarray(_frequency_mask(kind, img.shape, cutoffs, half=True))
+            return cp.fft.irfft2(F, s=img.shape)
+        F = cp.fft.fft2(img.astype(cp.complex64, copy=False))
+        F *= cp.asarray(_frequency_mask(kind, img.shape, cutoffs))
+        return cp.fft.ifft2(F).real
     
     def show_magnitude_spectrum(self, img, title="Magnitude Spectrum"):
         """Display magnitude spectrum of image"""
         F = np.fft.fft2(img)
-        F_shifted = np.fft.fftshift(F)
-        magnitude = np.log(np.abs(F_shifted) + 1)
+        # shift the real magnitude rather than the complex spectrum, and take the log in place
+        magnitude = np.abs(F)
+        np.log1p(magnitude, out=magnitude)
+        magnitude = np.fft.fftshift(magnitude)
         
         plt.figure(figsize=(8, 6))
         plt.imshow(magnitude, cmap='gray')
@@ -98,6 +111,51 @@ class FromScratchFourier:
         plt.colorbar()
         plt.show()
 
+def _backend(img):
+    """Array module for img: CuPy for arrays already on the GPU, NumPy otherwise"""
+    if cp is not None and isinstance(img, cp.ndarray):
+        return cp
+    return np
+
+@functools.lru_cache(maxsize=16)
+def _twiddles(N):
+    """exp(-2j*pi*k/N) for k < N/2; stage m of fft1d uses every (N/m)-th entry"""
+    twiddle_factors = np.exp(-2j * np.pi * np.arange(N // 2) / N)
+    twiddle_factors.setflags(write=False)
+    return twiddle_factors
+
+@functools.lru_cache(maxsize=16)
+def _bit_reversal(N):
+    """Index permutation that reverses the log2(N) bits of every position"""
+    levels = N.bit_length() - 1
+    idx = np.arange(N)
+    rev = np.zeros(N, dtype=np.intp)
+    for b in range(levels):
+        rev |= ((idx >> b) & 1) << (levels - 1 - b)
+    rev.setflags(write=False)
+    return rev
+
+@functools.lru_cache(maxsize=32)
+def _frequency_mask(kind, shape, cutoffs, half=False):
+    """
+    Frequency mask built directly in unshifted FFT layout, so no fftshift/ifftshift is needed.
+    With half=True only the W//2+1 non-negative column frequencies kept by rfft2 are built.
+    Cached across calls and instances, so the returned mask is read-only.
+    """
+    H, W = shape
+    # integer offset of every FFT bin from the fftshift-ed center, laid out unshifted
+    ky = np.fft.ifftshift(np.arange(H) - H // 2)
+    kx = np.arange(W // 2 + 1) if half else np.fft.ifftshift(np.arange(W) - W // 2)
+    dist_sq = ky[:, None]**2 + kx[None, :]**2
+    if kind == "low":
+        mask = dist_sq < cutoffs[0]**2
+    elif kind == "high":
+        mask = dist_sq >= cutoffs[0]**2
+    else:
+        mask = (dist_sq > cutoffs[0]**2) & (dist_sq < cutoffs[1]**2)
+    mask.setflags(write=False)
+    return mask
+
 if __name__ == "__main__":
     # Test the Fourier transform implementations
     fourier = FromScratchFourier()
@@ -120,6 +178,7 @@ if __name__ == "__main__":
     print("Computing FFT...")
     fft_result = fourier.fft2d(img)
     print(f"FFT result shape: {fft_result.shape}")
+    print("From-scratch FFT matches:", np.allclose(fourier.fft2d(img, educational=True), fft_result))
     
     # Show magnitude spectrum
     fourier.show_magnitude_spectrum(img, "Original Image Spectrum")
@@ -3,32 +3,135 @@ import matplotlib.pyplot as plt
 import cv2
 import math
 
+try:
+    from numba import njit, prange
+except ImportError:
+    # numba is optional here, mygetGaborKernel falls back to NumPy broadcasting
+    njit = None
+
 class FromScratchGaborKernel():
-    def __init__(self, theta=0, lambd=8, sigma=4.0, gamma=0.5, psi=0, size=31):
+    def __init__(self, theta=0, lambd=8, sigma=4.0, gamma=0.5, psi=0, size=31, dtype=np.float32):
         self.theta = theta
         self.lambd = lambd
         self.sigma = sigma
         self.gamma = gamma
         self.psi = psi
         self.size = size
-        self.kernel = mygetGaborKernel(theta, lambd, sigma, gamma, psi, size)
+        self.dtype = dtype
+        # 1D factors with kernel == np.outer(gx, gy) for axis-aligned theta, otherwise None
+        self.gx, self.gy = mygetGaborSeparable(theta, lambd, sigma, gamma, psi, size, dtype) or (None, None)
+        if self.gx is not None:
+            self.kernel = np.outer(self.gx, self.gy)
+        else:
+            self.kernel = mygetGaborKernel(theta, lambd, sigma, gamma, psi, size, dtype)
+
+# Gabor kernel implementation, float32 by default (what cv2.filter2D and friends consume);
+# pass dtype=np.float64 for numerical analysis
+def mygetGaborKernel(theta, lambd, sigma=4.0, gamma=0.5, psi=0, size=31, dtype=np.float32):
+    separable = mygetGaborSeparable(theta, lambd, sigma, gamma, psi, size, dtype)
+    if separable is not None:
+        return np.outer(*separable)
 
-# Gabor kernel implementation
-def mygetGaborKernel(theta, lambd, sigma=4.0, gamma=0.5, psi=0, size=31):
     half = size // 2
-    y, x = np.meshgrid(np.arange(-half, half+1), np.arange(-half, half+1))
+    if njit is not None:
+        # 2*half+1 cells per side, centered on the middle one, like np.arange(-half, half+1) below
+        return _gabor_numba(math.cos(theta), math.sin(theta), float(lambd), float(sigma),
+                            float(gamma), float(psi), np.empty((2*half+1, 2*half+1), dtype=dtype))
+
+    # x runs down the rows and y along the columns (same layout as meshgrid(y, x) before),
+    # kept as a column and a row that broadcast instead of two full grids
+    coords = np.arange(-half, half+1, dtype=dtype)
+    x = coords[:, None]
+    y = coords[None, :]
+    cos_theta = math.cos(theta)
+    sin_theta = math.sin(theta)
 
     # Rotate coordinates according to theta
-    x_theta = x * np.cos(theta) + y * np.sin(theta)
-    y_theta = -x * np.sin(theta) + y * np.cos(theta)
+    x_theta = x * cos_theta + y * sin_theta
 
-    # Gaussian envelope
-    exp_term = np.exp(-(x_theta**2 + (gamma**2) * y_theta**2) / (2 * sigma**2))
-    
-    # Sinusoidal component
-    cos_term = np.cos(2 * np.pi * x_theta / lambd + psi)
+    # Gaussian envelope, with the rotation-invariant x^2 + y^2 when gamma == 1
+    if gamma == 1:
+        kernel = x*x + y*y
+    else:
+        y_theta = y * cos_theta - x * sin_theta
+        kernel = x_theta * x_theta
+        kernel += (gamma * gamma) * (y_theta * y_theta)
+    kernel *= -0.5 / sigma**2
+    np.exp(kernel, out=kernel)
+
+    # Sinusoidal component, multiplied into the envelope in place
+    phase = x_theta * (2 * np.pi / lambd)
+    phase += psi
+    kernel *= np.cos(phase, out=phase)
+    return kernel
+
+# Bank of Gabor kernels for several orientations, shape (len(thetas), size, size).
+# One coordinate grid is shared by every theta and exp/cos each run once over the whole stack.
+def mygetGaborBank(thetas, lambd, sigma=4.0, gamma=0.5, psi=0, size=31, dtype=np.float32):
+    scalar = np.dtype(dtype).type
+    half = size // 2
+    coords = np.arange(-half, half+1, dtype=dtype)
+    x = coords[None, :, None]
+    y = coords[None, None, :]
+    thetas = np.asarray(thetas, dtype=dtype).reshape(-1, 1, 1)
+    cos_theta = np.cos(thetas)
+    sin_theta = np.sin(thetas)
 
-    return exp_term * cos_term
+    x_theta = x * cos_theta + y * sin_theta
+    y_theta = y * cos_theta - x * sin_theta
+
+    bank = x_theta * x_theta
+    y_theta *= y_theta
+    y_theta *= scalar(gamma * gamma)
+    bank += y_theta
+    bank *= scalar(-0.5 / sigma**2)
+    np.exp(bank, out=bank)
+
+    x_theta *= scalar(2 * np.pi / lambd)
+    x_theta += scalar(psi)
+    bank *= np.cos(x_theta, out=x_theta)
+    return bank
+
+if njit is not None:
+    # envelope and carrier in one compiled loop nest, rows split across threads;
+    # every division is hoisted out so the inner loop vectorizes
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _gabor_numba(cos_theta, sin_theta, lambd, sigma, gamma, psi, out):
+        half = out.shape[0] // 2
+        inv_two_sigma_sq = 0.5 / (sigma * sigma)
+        gamma_sq = gamma * gamma
+        omega = 2 * np.pi / lambd
+        for r in prange(out.shape[0]):
+            x = r - half
+            for c in range(out.shape[1]):
+                y = c - half
+                x_theta = x * cos_theta + y * sin_theta
+                y_theta = y * cos_theta - x * sin_theta
+                out[r, c] = (math.exp(-(x_theta*x_theta + gamma_sq*y_theta*y_theta) * inv_two_sigma_sq)
+                             * math.cos(omega * x_theta + psi))
+        return out
+
+# For theta a multiple of pi/2 the rotated axes line up with the grid, so the kernel is the outer
+# product of a 1D factor over x (rows) and a 1D factor over y (columns): O(K) to build instead of
+# O(K^2), and it can be applied as two 1D convolutions. Returns (gx, gy), or None for other angles.
+def mygetGaborSeparable(theta, lambd, sigma=4.0, gamma=0.5, psi=0, size=31, dtype=np.float32):
+    cos_theta = math.cos(theta)
+    sin_theta = math.sin(theta)
+    if abs(sin_theta) < 1e-12:
+        # x_theta = +-x, y_theta = +-y: the carrier runs along x
+        carrier_sign, carrier_on_x = math.copysign(1.0, cos_theta), True
+    elif abs(cos_theta) < 1e-12:
+        # x_theta = +-y, y_theta = -+x: the carrier runs along y
+        carrier_sign, carrier_on_x = math.copysign(1.0, sin_theta), False
+    else:
+        return None
+
+    half = size // 2
+    coords = np.arange(-half, half+1, dtype=dtype)
+    inv_two_sigma_sq = 0.5 / sigma**2
+    carrier = np.exp(-coords*coords * inv_two_sigma_sq) * np.cos(carrier_sign * (2 * np.pi / lambd) * coords + psi)
+    envelope = np.exp(-(gamma * coords)**2 * inv_two_sigma_sq)
+    return (carrier, envelope) if carrier_on_x else (envelope, carrier)
 
 if __name__ == "__main__":
     # Test the Gabor kernel
@@ -2,11 +2,20 @@ import numpy as np
 import cv2
 import matplotlib.pyplot as plt
 import os
+import functools
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from sklearn.svm import LinearSVC
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
 
+try:
+    from numba import njit, prange
+except ImportError:
+    # numba is optional here, the cell histograms fall back to np.bincount scatters
+    njit = None
+
 class FromScratchHOG:
     def __init__(self, cell_size=8, block_size=2, num_bins=9):
         self.cell_size = cell_size
@@ -16,61 +25,70 @@ class FromScratchHOG:
         self.classifier = LinearSVC()
     
     def compute_hog(self, img):
-        gx = cv2.Sobel(img, ddepth=cv2.CV_32F, dx=1, dy=0)
-        gy = cv2.Sobel(img, ddepth=cv2.CV_32F, dx=0, dy=1)
+        # scratch buffers reused across calls with the same image size, e.g. every image of load_dataset
+        gx, gy, magnitude, angle, fold = _gradient_buffers(img.shape)
+        cv2.Sobel(img, ddepth=cv2.CV_32F, dx=1, dy=0, dst=gx)
+        cv2.Sobel(img, ddepth=cv2.CV_32F, dx=0, dy=1, dst=gy)
 
-        magnitude = np.sqrt(gx**2 + gy**2)
-        angle = np.rad2deg(np.atan2(gy, gx)) % 180
+        # magnitude and angle in degrees from one OpenCV pass, then folded to unsigned orientation in place;
+        # angles are in [0, 360], so the fold is one masked subtraction (much cheaper than a float np.mod)
+        cv2.cartToPolar(gx, gy, magnitude=magnitude, angle=angle, angleInDegrees=True)
+        cv2.compare(angle, 180.0, cv2.CMP_GE, dst=fold)
+        cv2.subtract(angle, 180.0, dst=angle, mask=fold)
         bin_partition_size = 180 / self.num_bins
 
         H, W = img.shape
         n_cells_x = W // self.cell_size
         n_cells_y = H // self.cell_size
         
-        hist = np.zeros((n_cells_y, n_cells_x, self.num_bins))
-
-        for i in range(n_cells_y):
-            for j in range(n_cells_x):
-                mag = magnitude[i*self.cell_size:(i+1)*self.cell_size, 
-                               j*self.cell_size:(j+1)*self.cell_size]
-                ang = angle[i*self.cell_size:(i+1)*self.cell_size, 
-                           j*self.cell_size:(j+1)*self.cell_size]
-
-                for m in range(self.cell_size):
-                    for n in range(self.cell_size):
-                        bin_idx = int(ang[m, n] / bin_partition_size)
-                        hist[i, j, bin_idx] += mag[m, n]
-
-        blocks = []
-        for i in range(n_cells_y - self.block_size + 1):
-            for j in range(n_cells_x - self.block_size + 1):
-                block = hist[i:i+self.block_size, j:j+self.block_size, :].flatten()
-                norm = np.linalg.norm(block) + 1e-6
-                blocks.append(block / norm)
-
-        return np.concatenate(blocks)
+        # crop to whole cells, then scatter every pixel's magnitude into the histograms at once
+        magnitude = magnitude[:n_cells_y*self.cell_size, :n_cells_x*self.cell_size]
+        angle = angle[:n_cells_y*self.cell_size, :n_cells_x*self.cell_size]
+
+        hist = _hist_buffer((n_cells_y, n_cells_x, self.num_bins))
+        if njit is not None:
+            _cell_histograms_numba(magnitude, angle, self.cell_size, bin_partition_size, hist)
+        else:
+            _cell_histograms(magnitude, angle, self.cell_size, bin_partition_size, hist)
+
+        # every overlapping block_size x block_size group of cells as one row, L2-normalized together
+        blocks = np.lib.stride_tricks.sliding_window_view(hist, (self.block_size, self.block_size), axis=(0, 1))
+        # window axes come last, so move the bins behind them to keep the (cell_y, cell_x, bin) block layout
+        blocks = blocks.transpose(0, 1, 3, 4, 2)
+        # block norms straight from the strided view, then one divide into the only new array, the descriptor
+        norms = np.sqrt(np.einsum('ijabk,ijabk->ij', blocks, blocks))
+        norms += 1e-6
+        features = np.empty(blocks.shape)
+        np.divide(blocks, norms[:, :, None, None, None], out=features)
+        return features.ravel()
     
-    def load_dataset(self, dataset_path, standard_size=(256, 256)):
-        images_0 = []
-        images_1 = []
-        
+    def load_dataset(self, dataset_path, standard_size=(256, 256), max_workers=None):
+        """
+        Read, resize and HOG-encode every image under dataset_path/0 and dataset_path/1.
+        Images are independent, so they are spread over a process pool (max_workers=None uses all cores).
+        """
+        tasks = []
         for label in ["0", "1"]:
             folder_path = os.path.join(dataset_path, label)
             for file_name in os.listdir(folder_path):
-                file_path = os.path.join(folder_path, file_name)
-                img = cv2.imread(file_path, cv2.IMREAD_GRAYSCALE)
-                img = cv2.resize(img, standard_size)
-                if label == "0":
-                    images_0.append(img)
-                else:
-                    images_1.append(img)
-        
-        data = [(self.compute_hog(img), 0) for img in images_0] + \
-               [(self.compute_hog(img), 1) for img in images_1]
-        
-        X = np.array([x for x, _ in data])
-        y = np.array([y for _, y in data])
-        
+                tasks.append((os.path.join(folder_path, file_name), int(label)))
+        if not tasks:
+            # nothing to encode, so no descriptor length either; empty like an empty directory used to give
+            return np.empty((0, 0)), np.empty(0, dtype=int)
+
+        # hand out the largest files first so that no worker is left decoding a big file at the end
+        order = sorted(range(len(tasks)), key=lambda k: os.path.getsize(tasks[k][0]), reverse=True)
+        worker = functools.partial(_hog_features, self, standard_size)
+        workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            features = list(ex.map(worker, [tasks[k][0] for k in order],
+                                   chunksize=max(1, len(tasks) // (4 * workers))))
+
+        # put the descriptors back in directory order, next to their labels
+        X = np.empty((len(tasks), features[0].size))
+        X[order] = features
+        y = np.array([label for _, label in tasks])
+
         return X, y
     
     def train_classifier(self, X, y):
@@ -95,25 +113,16 @@ class FromScratchHOG:
         labels = labels[sorted_idx]
         
         total_neg = np.sum(labels == 0)
-        miss_rates = []
-        fppw = []
         
-        tp = 0
-        fp = 0
-        fn = np.sum(labels == 1)
+        # lowering the threshold past each sorted score admits one more window:
+        # running counts of positives and negatives admitted so far give tp and fp at every threshold
+        pos = labels == 1
+        tp = np.cumsum(pos)
+        fp = np.cumsum(~pos)
+        fn = np.sum(pos) - tp
         
-        for i in range(len(scores)):
-            if labels[i] == 1:
-                tp += 1
-                fn -= 1
-            else:
-                fp += 1
-            
-            miss_rate = fn / (tp + fn + 1e-9)
-            fppw_val = fp / (total_neg + 1e-9)
-            
-            miss_rates.append(miss_rate)
-            fppw.append(fppw_val)
+        miss_rates = fn / (tp + fn + 1e-9)
+        fppw = fp / (total_neg + 1e-9)
         
         plt.figure(figsize=(6, 5))
         plt.loglog(fppw, miss_rates, label="HOG Detector")
@@ -124,6 +133,103 @@ class FromScratchHOG:
         plt.title("DET Curve")
         plt.show()
 
+# per-thread scratch (gx, gy, magnitude, angle and the cell histograms) for compute_hog; kept off the instance so that
+# FromScratchHOG stays picklable for the process pool and concurrent threads never share buffers
+_scratch = threading.local()
+
+def _gradient_buffers(shape):
+    buffers = getattr(_scratch, "buffers", None)
+    if buffers is None or buffers[0].shape != shape:
+        # plus a uint8 mask for the angle fold
+        buffers = tuple(np.empty(shape, dtype=np.float32) for _ in range(4)) + (np.empty(shape, dtype=np.uint8),)
+        _scratch.buffers = buffers
+    return buffers
+
+def _hist_buffer(shape):
+    # zeroed per call; it never leaves compute_hog, which returns a fresh descriptor array
+    hist = getattr(_scratch, "hist", None)
+    if hist is None or hist.shape != shape:
+        hist = np.empty(shape)
+        _scratch.hist = hist
+    hist.fill(0)
+    return hist
+
+# module level so the process pool can pickle it; hog only carries the cell/block/bin settings
+def _hog_features(hog, standard_size, file_path):
+    img = cv2.imread(file_path, cv2.IMREAD_GRAYSCALE)
+    img = cv2.resize(img, standard_size)
+    return hog.compute_hog(img)
+
+# soft (trilinear) binning as in Dalal-Triggs: every pixel votes into its two nearest orientation
+# bins and its 2x2 nearest cells, weighted by its distance to the bin and cell centers
+def _cell_histograms(magnitude, angle, cell_size, bin_size, hist):
+    n_cells_y, n_cells_x, num_bins = hist.shape
+    bin0, bin1, bin_w1 = _linear_split(angle / bin_size - 0.5)
+    bin0 %= num_bins
+    bin1 %= num_bins
+    y0, y1, wy1 = _linear_split((np.arange(n_cells_y*cell_size) + 0.5) / cell_size - 0.5, n_cells_y)
+    x0, x1, wx1 = _linear_split((np.arange(n_cells_x*cell_size) + 0.5) / cell_size - 0.5, n_cells_x)
+
+    flat_hist = hist.reshape(-1)
+    for cell_y, wy in ((y0, 1 - wy1), (y1, wy1)):
+        for cell_x, wx in ((x0, 1 - wx1), (x1, wx1)):
+            cell_idx = (cell_y[:, None]*n_cells_x + cell_x[None, :]) * num_bins
+            vote = magnitude * (wy[:, None] * wx[None, :])
+            for bin_idx, wb in ((bin0, 1 - bin_w1), (bin1, bin_w1)):
+                flat_hist += np.bincount((cell_idx + bin_idx).ravel(), weights=(vote * wb).ravel(),
+                                         minlength=flat_hist.size)
+
+if njit is not None:
+    # same votes as _cell_histograms; each thread owns one row of cells and only visits the pixel rows
+    # that can reach it, so the scattered += never races
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _cell_histograms_numba(magnitude, angle, cell_size, bin_size, hist):
+        n_cells_y, n_cells_x, num_bins = hist.shape
+        for cy in prange(n_cells_y):
+            for y in range(max(0, (cy - 1)*cell_size), min(n_cells_y*cell_size, (cy + 2)*cell_size)):
+                fy = (y + 0.5) / cell_size - 0.5
+                y0 = int(np.floor(fy))
+                wy1 = fy - y0
+                # share of this pixel row that lands in cell row cy, edge rows clamped like _linear_split
+                wy = 0.0
+                if min(max(y0, 0), n_cells_y - 1) == cy:
+                    wy += 1.0 - wy1
+                if min(max(y0 + 1, 0), n_cells_y - 1) == cy:
+                    wy += wy1
+                if wy == 0.0:
+                    continue
+                for x in range(n_cells_x*cell_size):
+                    fx = (x + 0.5) / cell_size - 0.5
+                    x0 = int(np.floor(fx))
+                    wx1 = fx - x0
+                    cx0 = min(max(x0, 0), n_cells_x - 1)
+                    cx1 = min(max(x0 + 1, 0), n_cells_x - 1)
+                    fb = angle[y, x] / bin_size - 0.5
+                    b0 = int(np.floor(fb))
+                    wb1 = fb - b0
+                    b1 = (b0 + 1) % num_bins
+                    b0 = b0 % num_bins
+                    vote = magnitude[y, x] * wy
+                    hist[cy, cx0, b0] += vote * (1.0 - wx1) * (1.0 - wb1)
+                    hist[cy, cx0, b1] += vote * (1.0 - wx1) * wb1
+                    hist[cy, cx1, b0] += vote * wx1 * (1.0 - wb1)
+                    hist[cy, cx1, b1] += vote * wx1 * wb1
+
+def _linear_split(pos, n=None):
+    """
+    Split fractional positions between their two neighbouring integer slots: returns (i0, i1, w1)
+    with pos = (1 - w1) * i0 + w1 * i1. With n given, slots are clamped to [0, n-1] so that votes
+    beyond the outermost centers go entirely to the edge slot.
+    """
+    i0 = np.floor(pos)
+    w1 = (pos - i0).astype(np.float32)
+    i0 = i0.astype(np.intp)
+    i1 = i0 + 1
+    if n is not None:
+        np.clip(i0, 0, n - 1, out=i0)
+        np.clip(i1, 0, n - 1, out=i1)
+    return i0, i1, w1
+
 if __name__ == "__main__":
     # Initialize HOG detector
     hog = FromScratchHOG(cell_size=8, block_size=2, num_bins=9)
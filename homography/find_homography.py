@@ -55,31 +55,38 @@ def normalize_points(pts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     return T, pts_norm
 
 
-def construct_A(src_pts: np.ndarray, dst_pts: np.ndarray) -> np.ndarray:
+def construct_A(src_pts: np.ndarray, dst_pts: np.ndarray, dtype=np.float32) -> np.ndarray:
     """
     Build the 2N x 9 matrix A for DLT from Nx2 src and dst points (cartesian).
+    Stacks of point sets (..., N, 2) give a stack of matrices (..., 2N, 9).
+    A is float32 by default; pass dtype=np.float64 for un-normalized points.
     """
-    src = np.asarray(src_pts, dtype=np.float64)
-    dst = np.asarray(dst_pts, dtype=np.float64)
-    if src.shape != dst.shape or src.ndim != 2 or src.shape[1] != 2:
+    src = np.asarray(src_pts, dtype=dtype)
+    dst = np.asarray(dst_pts, dtype=dtype)
+    if src.shape != dst.shape or src.ndim < 2 or src.shape[-1] != 2:
         raise ValueError("src and dst must be Nx2 and same shape")
 
-    N = src.shape[0]
-    A = np.zeros((2 * N, 9), dtype=np.float64)
-    for i in range(N):
-        x, y = src[i]
-        u, v = dst[i]
-        A[2*i]   = [-x, -y, -1,  0,  0,  0, u*x, u*y, u]
-        A[2*i+1] = [ 0,  0,  0, -x, -y, -1, v*x, v*y, v]
+    N = src.shape[-2]
+    A = np.zeros(src.shape[:-2] + (2 * N, 9), dtype=dtype)
+    # even rows: [-x, -y, -1,  0,  0,  0, u*x, u*y, u]
+    # odd rows:  [ 0,  0,  0, -x, -y, -1, v*x, v*y, v]
+    src_h = np.concatenate([src, np.ones(src.shape[:-1] + (1,), dtype=dtype)], axis=-1)
+    A[..., 0::2, 0:3] = -src_h
+    A[..., 1::2, 3:6] = -src_h
+    A[..., 0::2, 6:9] = dst[..., 0:1] * src_h
+    A[..., 1::2, 6:9] = dst[..., 1:2] * src_h
     return A
 
 
 def solve_homography_dlt(src_pts: np.ndarray, dst_pts: np.ndarray,
-                         normalize: bool = True) -> np.ndarray:
+                         normalize: bool = True, dtype=np.float32) -> np.ndarray:
     """
     Compute homography H (3x3) that maps src_pts -> dst_pts using DLT.
     If normalize=True, points are normalized (recommended).
     Returns H with H[2,2] == 1 (if possible).
+    The SVD runs and H is returned in dtype, float32 by default, which is plenty for pixel
+    accuracy on normalized points; the 3x3 normalization transforms stay in float64.
+    Pass dtype=np.float64 for double precision, e.g. with normalize=False.
     """
     src = np.asarray(src_pts, dtype=np.float64)
     dst = np.asarray(dst_pts, dtype=np.float64)
@@ -95,7 +102,7 @@ def solve_homography_dlt(src_pts: np.ndarray, dst_pts: np.ndarray,
         src_n = src
         dst_n = dst
 
-    A = construct_A(src_n, dst_n)
+    A = construct_A(src_n, dst_n, dtype=dtype)
     # SVD solution of Ah=0
     U, S, Vt = np.linalg.svd(A)
     h = Vt[-1, :]  # last row of V^T
@@ -109,34 +116,111 @@ def solve_homography_dlt(src_pts: np.ndarray, dst_pts: np.ndarray,
     else:
         H = H / np.linalg.norm(H)
 
-    return H
+    return H.astype(dtype, copy=False)
 
 
 def warp_points(H: np.ndarray, pts: np.ndarray) -> np.ndarray:
     """
     Apply homography H to Nx2 points and return Nx2 warped points.
     """
-    pts_h = to_homogeneous(pts)
-    warped_h = (H @ pts_h.T).T
-    return from_homogeneous(warped_h)
+    warped_h = _apply_homography(H, pts)
+    return warped_h[:, :2] / warped_h[:, 2:3]
 
 
 def reprojection_errors(H: np.ndarray, src_pts: np.ndarray, dst_pts: np.ndarray) -> np.ndarray:
     """
     Returns per-point Euclidean reprojection errors.
     """
-    projected = warp_points(H, src_pts)
+    warped_h = _apply_homography(H, src_pts)
     dst = np.asarray(dst_pts, dtype=np.float64)
-    errs = np.linalg.norm(projected - dst, axis=1)
-    return errs
+    w = warped_h[:, 2]
+    return np.hypot(warped_h[:, 0] / w - dst[:, 0], warped_h[:, 1] / w - dst[:, 1])
 
 
-def is_degenerate_sample(src_sample: np.ndarray) -> bool:
+def _apply_homography(H: np.ndarray, pts: np.ndarray) -> np.ndarray:
     """
-    Check degeneracy: if sample pts are collinear (rank < 3), it's degenerate.
-    src_sample: 4x2 array
+    H @ [x, y, 1] for Nx2 points as an Nx3 array, without building the homogeneous points.
+    Zero last coordinates are replaced by 1e-12, like from_homogeneous.
     """
-    assert src_sample.shape[0] >= 3
-    src_h = to_homogeneous(src_sample[:4])  # ensure at most 4
-    rank = np.linalg.matrix_rank(src_h.T)
-    return rank < 3
+    pts = np.asarray(pts, dtype=np.float64)
+    if pts.ndim != 2 or pts.shape[1] != 2:
+        raise ValueError("pts must be Nx2")
+    warped_h = pts @ H[:, :2].T
+    warped_h += H[:, 2]
+    denom = warped_h[:, 2]
+    # avoid division by zero
+    denom[denom == 0] = 1e-12
+    return warped_h
+
+
+def solve_homography_dlt_batch(src_pts: np.ndarray, dst_pts: np.ndarray, dtype=np.float32) -> np.ndarray:
+    """
+    Normalized DLT for a stack of K point sets at once: (K, n, 2) src and dst -> (K, 3, 3) homographies.
+    Same result as calling solve_homography_dlt(normalize=True, dtype=dtype) on every set, with one
+    batched SVD; in float32 (the default) that SVD also runs at twice the float64 throughput.
+    """
+    src = np.asarray(src_pts, dtype=np.float64)
+    dst = np.asarray(dst_pts, dtype=np.float64)
+    if src.shape[-2] < 4:
+        raise ValueError("At least 4 correspondences required")
+
+    T_src, src_n = _normalize_points_batch(src)
+    T_dst, dst_n = _normalize_points_batch(dst)
+
+    A = construct_A(src_n, dst_n, dtype=dtype)
+    U, S, Vt = np.linalg.svd(A)
+    Hn = Vt[:, -1, :].reshape(-1, 3, 3)
+
+    H = np.linalg.inv(T_dst) @ Hn @ T_src
+    # H[2,2] == 1 where possible, unit norm otherwise
+    h22 = H[:, 2:3, 2:3]
+    scale = np.where(np.abs(h22) > 1e-12, h22, np.linalg.norm(H, axis=(1, 2), keepdims=True))
+    return (H / scale).astype(dtype, copy=False)
+
+
+def reprojection_errors_batch(H: np.ndarray, src_pts: np.ndarray, dst_pts: np.ndarray) -> np.ndarray:
+    """
+    Reprojection errors of all N correspondences under each of K homographies, as a (K, N) array.
+    """
+    src_h = to_homogeneous(src_pts)
+    dst = np.asarray(dst_pts, dtype=np.float64)
+    warped_h = np.einsum('kij,nj->kni', H, src_h)
+    denom = warped_h[..., 2:3]
+    # avoid division by zero, like from_homogeneous
+    denom[denom == 0] = 1e-12
+    return np.linalg.norm(warped_h[..., :2] / denom - dst, axis=-1)
+
+
+def _normalize_points_batch(pts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    normalize_points for a stack of point sets (K, n, 2): returns (K, 3, 3) transforms and normalized points.
+    """
+    mean = pts.mean(axis=1, keepdims=True)
+    pts_centered = pts - mean
+    avg_dist = np.mean(np.sqrt(np.sum(pts_centered**2, axis=2)), axis=1)
+    scale = np.sqrt(2) / np.where(avg_dist == 0, np.sqrt(2), avg_dist)
+
+    T = np.zeros((pts.shape[0], 3, 3), dtype=np.float64)
+    T[:, 0, 0] = scale
+    T[:, 1, 1] = scale
+    T[:, :2, 2] = -scale[:, None] * mean[:, 0]
+    T[:, 2, 2] = 1.0
+    return T, pts_centered * scale[:, None, None]
+
+
+def is_degenerate_sample(src_sample: np.ndarray):
+    """
+    Check degeneracy: if sample pts are collinear (rank < 3), it's degenerate.
+    src_sample: 4x2 array, or a (K, 4, 2) stack of samples for a length-K boolean array.
+    The points are collinear iff every pair of offsets p_i - p_0 has a (near) zero cross product,
+    which costs a few multiplies instead of an SVD.
+    """
+    assert src_sample.shape[-2] >= 3
+    pts = np.asarray(src_sample[..., :4, :], dtype=np.float64)  # ensure at most 4
+    v = pts[..., 1:, :] - pts[..., :1, :]
+    # all 2x2 minors of the offsets: v_i x v_j for i < j
+    i, j = np.triu_indices(v.shape[-2], k=1)
+    cross = v[..., i, 0] * v[..., j, 1] - v[..., i, 1] * v[..., j, 0]
+    # relative to the spread of the sample, so the test does not depend on the pixel scale
+    scale = np.max(np.sum(v**2, axis=-1), axis=-1)
+    return np.all(np.abs(cross) <= 1e-10 * scale[..., None], axis=-1)
@@ -1,17 +1,22 @@
 import numpy as np
-from typing import Tuple
-from find_homography import solve_homography_dlt, is_degenerate_sample, reprojection_errors
+from typing import Optional, Tuple
+from find_homography import solve_homography_dlt, solve_homography_dlt_batch, reprojection_errors_batch, is_degenerate_sample
 
 
 def ransac_homography(src_pts: np.ndarray, dst_pts: np.ndarray,
                       thresh: float = 3.0,
                       max_iters: int = 2000,
                       confidence: float = 0.99,
-                      verbose: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+                      verbose: bool = False,
+                      batch_size: int = 128,
+                      rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
     """
     Robust homography estimation via RANSAC.
     Returns best_H, inlier_mask (boolean array of length N).
     thresh: reprojection error threshold in pixels.
+    Candidates are drawn, solved and scored batch_size at a time; the adaptive iteration
+    count is checked between batches.
+    rng: random Generator used for sampling (a fresh default_rng() if None).
     """
     src = np.asarray(src_pts, dtype=np.float64)
     dst = np.asarray(dst_pts, dtype=np.float64)
@@ -19,6 +24,12 @@ def ransac_homography(src_pts: np.ndarray, dst_pts: np.ndarray,
     if N < 4:
         raise ValueError("Need at least 4 points for RANSAC")
 
+    if rng is None:
+        rng = np.random.default_rng()
+    # numerator of the adaptive iteration bound, fixed by the confidence (eps avoids log(0))
+    eps = 1e-9
+    log_nom = np.log(1 - confidence + eps)
+
     best_H = None
     best_inliers = np.zeros(N, dtype=bool)
     best_count = 0
@@ -27,46 +38,41 @@ def ransac_homography(src_pts: np.ndarray, dst_pts: np.ndarray,
     required_iters = max_iters
 
     while it < required_iters and it < max_iters:
-        # random sample
-        idx = np.random.choice(N, 4, replace=False)
+        K = min(batch_size, required_iters - it, max_iters - it)
+        idx = _sample_indices(rng, N, K)
         s_src = src[idx]
         s_dst = dst[idx]
 
         # skip degenerate samples
-        if is_degenerate_sample(s_src) or is_degenerate_sample(s_dst):
-            it += 1
-            continue
-
-        try:
-            H_candidate = solve_homography_dlt(s_src, s_dst, normalize=True)
-        except np.linalg.LinAlgError:
-            it += 1
+        valid = ~(is_degenerate_sample(s_src) | is_degenerate_sample(s_dst))
+        if not valid.any():
+            it += K
             continue
 
-        errs = reprojection_errors(H_candidate, src, dst)
-        inliers_mask = errs < thresh
-        count = int(np.sum(inliers_mask))
+        H_candidates = solve_homography_dlt_batch(s_src[valid], s_dst[valid])
+        inlier_masks = reprojection_errors_batch(H_candidates, src, dst) < thresh
+        counts = inlier_masks.sum(axis=1)
 
-        if count > best_count:
-            best_count = count
-            best_H = H_candidate
-            best_inliers = inliers_mask
+        # first candidate with the highest count, as the one-at-a-time loop would have kept
+        k = int(np.argmax(counts))
+        if counts[k] > best_count:
+            best_count = int(counts[k])
+            best_H = H_candidates[k]
+            best_inliers = inlier_masks[k]
 
             # update required iterations (adaptive)
             w = best_count / float(N)  # inlier ratio
             # avoid log(0) and pow saturation
-            eps = 1e-9
-            nom = np.log(1 - confidence + eps)
-            denom = np.log(max(1e-9, 1 - (w**4)))
+            denom = np.log(max(eps, 1 - (w**4)))
             if denom != 0:
-                required_iters = int(min(max_iters, np.ceil(nom / denom)))
+                required_iters = int(min(max_iters, np.ceil(log_nom / denom)))
             else:
                 required_iters = 1
 
             if verbose:
                 print(f"[RANSAC] it={it}, best_count={best_count}, new required_iters={required_iters}")
 
-        it += 1
+        it += K
 
     # final refinement: re-estimate H using all inliers if we have enough
     if best_count >= 4:
@@ -77,3 +83,19 @@ def ransac_homography(src_pts: np.ndarray, dst_pts: np.ndarray,
     else:
         # fallback: return best candidate without refinement
         return best_H, best_inliers
+
+
+def _sample_indices(rng: np.random.Generator, N: int, K: int) -> np.ndarray:
+    """
+    K samples of 4 distinct indices out of N, as a (K, 4) array.
+    Draws with replacement and redraws only the rows that repeat an index, which is O(K) per
+    round instead of the O(N) permutation behind choice(replace=False).
+    """
+    idx = rng.integers(N, size=(K, 4))
+    while True:
+        srt = np.sort(idx, axis=1)
+        repeated = (srt[:, 1:] == srt[:, :-1]).any(axis=1)
+        if not repeated.any():
+            return idx
+        idx[repeated] = rng.integers(N, size=(int(repeated.sum()), 4))
+
@@ -1,6 +1,5 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import cv2
+import functools
 import math
 
 class FromScratchPrewitt():
@@ -9,46 +8,44 @@ class FromScratchPrewitt():
             self.prewitt_operator = mygetPrewittKernelAlpha(ksize, alpha)
         else:
             self.Gx, self.Gy, self.G_magnitude, self.G_theta = mygetPrewittKernel(ksize)
-            self.prewitt_operator = mygetPrewittKernelAlpha(ksize, alpha=np.atan2(dy, dx))
+            self.prewitt_operator = mygetPrewittKernelAlpha(ksize, alpha=math.atan2(dy, dx))
+        self.ksize = ksize
+        self.alpha = alpha if alpha != 0 else math.atan2(dy, dx)
+
+    def apply(self, img):
+        """
+        Filter img with the classic separable Prewitt operator in the direction of alpha.
+        Two 1D passes per derivative (O(K) per pixel) instead of one dense KxK pass (O(K^2)).
+        """
+        import cv2  # only needed here, kept out of module import time
+
+        diff_x, smooth_y = mygetPrewittSeparable(self.ksize)
+        diff_y, smooth_x = mygetPrewittSeparable(self.ksize[::-1])
+        # g_alpha = cos a * gx + sin a * gy, each one a row pass followed by a column pass
+        gx = cv2.sepFilter2D(img, cv2.CV_32F, diff_x, smooth_y, borderType=cv2.BORDER_CONSTANT)
+        gy = cv2.sepFilter2D(img, cv2.CV_32F, smooth_x, diff_y, borderType=cv2.BORDER_CONSTANT)
+        return math.cos(self.alpha) * gx + math.sin(self.alpha) * gy
 
 # Prewitt operator, defined for just alpha=0 (x-direction) and alpha=math.pi/2 (y-direction)
 def mygetPrewittKernel(ksize=(3,3)):
     """
     Generate Prewitt kernels for x and y directions for any kernel size.
     Following the same mathematical approach as Sobel but with uniform weighting concept.
+    Results are cached per ksize and returned as read-only arrays.
     """
-    center_y = (ksize[0]-1)/2
-    center_x = (ksize[1]-1)/2
-    Gx = []
-    Gy = []
-    G_magnitude = []
-    G_angle = []
-    
-    for y in range(ksize[1]):  # Note: using ksize[1] for y range like Sobel
-        rowx = []
-        rowy = []
-        rowmag = []
-        rowangle = []
-        j = y - center_y
-        for x in range(ksize[0]):  # Note: using ksize[0] for x range like Sobel
-            i = x - center_x
-            dist_squared = i**2 + j**2
-            if dist_squared != 0:
-                # Prewitt: same gradient calculation as Sobel (uniform weighting is conceptual)
-                Gx_ij = i/dist_squared
-                Gy_ij = j/dist_squared
-            else:
-                Gx_ij = 0
-                Gy_ij = 0
-            rowx.append(Gx_ij)
-            rowy.append(Gy_ij)
-            rowmag.append((Gx_ij**2 + Gy_ij**2)**0.5)
-            rowangle.append(np.atan2(Gy_ij, Gx_ij))
-        Gx.append(rowx)
-        Gy.append(rowy)
-        G_magnitude.append(rowmag)
-        G_angle.append(rowangle)
-    return np.array(Gx), np.array(Gy), np.array(G_magnitude), np.array(G_angle)
+    return _cached_prewitt_kernel(tuple(ksize))
+
+@functools.lru_cache(maxsize=256)
+def _cached_prewitt_kernel(ksize):
+    i, j, dist_squared = _prewitt_offsets(ksize)
+    nonzero = dist_squared != 0
+    safe_dist_squared = np.where(nonzero, dist_squared, 1)
+    # Prewitt: same gradient calculation as Sobel (uniform weighting is conceptual)
+    Gx = np.where(nonzero, i/safe_dist_squared, 0.0)
+    Gy = np.where(nonzero, j/safe_dist_squared, 0.0)
+    G_magnitude = np.hypot(Gx, Gy)
+    G_angle = np.arctan2(Gy, Gx)
+    return _read_only(Gx, Gy, G_magnitude, G_angle)
 
 # g_alpha = (alpha-unit vector) dot (gx, gy)
 #         = (cos a, sin a) dot (gx, gy)
@@ -59,24 +56,47 @@ def mygetPrewittKernelAlpha(ksize=(3,3), alpha=0):
     """
     Generate Prewitt kernel in a specific direction (alpha) for any kernel size.
     Following the same mathematical approach as Sobel.
+    Results are cached per (ksize, alpha) and returned as a read-only array.
     """
+    return _cached_prewitt_kernel_alpha(tuple(ksize), float(alpha))
+
+@functools.lru_cache(maxsize=256)
+def _cached_prewitt_kernel_alpha(ksize, alpha):
+    i, j, dist_squared = _prewitt_offsets(ksize)
+    nonzero = dist_squared != 0
+    safe_dist_squared = np.where(nonzero, dist_squared, 1)
+    # trig of alpha once, as Python floats that broadcast as plain constants
+    cos_alpha = math.cos(alpha)
+    sin_alpha = math.sin(alpha)
+    G_alpha, = _read_only(np.where(nonzero, (cos_alpha * i + sin_alpha * j)/safe_dist_squared, 0.0))
+    return G_alpha
+
+# cached kernels are shared between callers, so they must not be modified in place
+def _read_only(*arrays):
+    for arr in arrays:
+        arr.setflags(write=False)
+    return arrays
+
+# Classic Prewitt factors: the x-derivative kernel is the outer product of a column of ones
+# (uniform averaging over ksize[1] rows) and a row of centered differences over ksize[0] columns,
+# e.g. [1, 1, 1]^T x [-1, 0, 1] for 3x3. The y-derivative uses the same factors with ksize reversed.
+def mygetPrewittSeparable(ksize=(3,3)):
+    """
+    Generate the (row_kernel, col_kernel) 1D factors of the x-direction Prewitt operator.
+    """
+    half_x = (ksize[0]-1)/2
+    row_kernel = np.arange(ksize[0], dtype=np.float32) - np.float32(half_x)
+    col_kernel = np.ones(ksize[1], dtype=np.float32)
+    return row_kernel, col_kernel
+
+# (x, y) offsets of every kernel cell from the center, as a row (i) and a column (j)
+# that broadcast to a ksize[1] x ksize[0] grid, plus their squared distance
+def _prewitt_offsets(ksize):
     center_y = (ksize[0]-1)/2
     center_x = (ksize[1]-1)/2
-    G_alpha = []
-    
-    for y in range(ksize[1]):  # Note: using ksize[1] for y range like Sobel
-        row_alpha = []
-        j = y - center_y
-        for x in range(ksize[0]):  # Note: using ksize[0] for x range like Sobel
-            i = x - center_x
-            dist_squared = i**2 + j**2
-            if dist_squared != 0:
-                Gij_alpha = (np.cos(alpha) * i + np.sin(alpha) * j)/dist_squared
-            else:
-                Gij_alpha = 0
-            row_alpha.append(Gij_alpha)
-        G_alpha.append(row_alpha)
-    return np.array(G_alpha)
+    j = np.arange(ksize[1])[:, None] - center_y  # Note: using ksize[1] for y range like Sobel
+    i = np.arange(ksize[0])[None, :] - center_x  # Note: using ksize[0] for x range like Sobel
+    return i, j, i**2 + j**2
 
 if __name__ == "__main__":
     alpha = math.pi/3
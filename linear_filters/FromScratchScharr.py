@@ -1,85 +1,131 @@
 import numpy as np
+import functools
 import matplotlib.pyplot as plt
 import cv2
 import math
 
+try:
+    from numba import njit, prange
+except ImportError:
+    # numba is optional here, the kernel builders fall back to NumPy broadcasting
+    njit = None
+
 class FromScratchScharr():
-    def __init__(self, ksize=(3,3), alpha=0, dx=1, dy=0):
-        if (alpha != 0):
-            self.scharr_operator = mygetScharrKernelAlpha(ksize, alpha)
-        else:
-            self.Gx, self.Gy, self.G_magnitude, self.G_theta = mygetScharrKernel(ksize)
-            self.scharr_operator = mygetScharrKernelAlpha(ksize, alpha=np.atan2(dy, dx))
+    def __init__(self, ksize=(3,3), alpha=0, dx=1, dy=0, dtype=np.float32):
+        if (alpha == 0):
+            alpha = math.atan2(dy, dx)
+        self._ksize = tuple(ksize)
+        self._dtype = np.dtype(dtype)
+        # kernels are shared through the caches, so repeated (ksize, alpha) pipelines build them only once
+        self.Gx, self.Gy, self.G_magnitude = _cached_scharr_gradients(self._ksize, self._dtype)
+        self.scharr_operator = mygetScharrKernelAlpha(ksize, alpha, dtype)
+
+    @property
+    def G_theta(self):
+        # only computed (then cached with the other kernels) for callers that actually ask for the angles
+        return _cached_scharr_kernel(self._ksize, self._dtype)[3]
 
 # Scharr operator, defined for just alpha=0 (x-direction) and alpha=math.pi/2 (y-direction)
-def mygetScharrKernel(ksize=(3,3)):
+def mygetScharrKernel(ksize=(3,3), dtype=np.float32, out_Gx=None, out_Gy=None, out_mag=None, out_angle=None):
     """
     Generate Scharr kernels for x and y directions for any kernel size.
     Scharr operator is optimized to minimize weighted mean squared angular error in Fourier domain.
+    Kernels are float32 by default (what cv2.filter2D and friends consume); pass dtype=np.float64
+    for numerical analysis.
+    Results are cached per (ksize, dtype) and returned as read-only arrays, unless out_* buffers
+    of shape (ksize[1], ksize[0]) are given, in which case all four kernels are written into them.
     """
-    center_y = (ksize[0]-1)/2
-    center_x = (ksize[1]-1)/2
-    Gx = []
-    Gy = []
-    G_magnitude = []
-    G_angle = []
-    
-    for y in range(ksize[1]):  # Note: using ksize[1] for y range like Sobel
-        rowx = []
-        rowy = []
-        rowmag = []
-        rowangle = []
-        j = y - center_y
-        for x in range(ksize[0]):  # Note: using ksize[0] for x range like Sobel
-            i = x - center_x
-            dist_squared = i**2 + j**2
-            if dist_squared != 0:
-                # Scharr uses optimized weighting based on Fourier domain optimization
-                # For generalization, we use a modified approach that approximates Scharr behavior
-                weight = 1.0 / (1.0 + dist_squared)  # Optimized weighting
-                Gx_ij = (i * weight) / dist_squared
-                Gy_ij = (j * weight) / dist_squared
-            else:
-                Gx_ij = 0
-                Gy_ij = 0
-            rowx.append(Gx_ij)
-            rowy.append(Gy_ij)
-            rowmag.append((Gx_ij**2 + Gy_ij**2)**0.5)
-            rowangle.append(np.atan2(Gy_ij, Gx_ij))
-        Gx.append(rowx)
-        Gy.append(rowy)
-        G_magnitude.append(rowmag)
-        G_angle.append(rowangle)
-    return np.array(Gx), np.array(Gy), np.array(G_magnitude), np.array(G_angle)
+    if out_Gx is None and out_Gy is None and out_mag is None and out_angle is None:
+        return _cached_scharr_kernel(tuple(ksize), np.dtype(dtype))
+    Gx, Gy = _scharr_gradients(ksize, dtype, out_Gx, out_Gy)
+    G_magnitude = np.hypot(Gx, Gy, out=out_mag)
+    G_angle = np.arctan2(Gy, Gx, out=out_angle)
+    return Gx, Gy, G_magnitude, G_angle
+
+@functools.lru_cache(maxsize=64)
+def _cached_scharr_gradients(ksize, dtype):
+    Gx, Gy = _scharr_gradients(ksize, dtype)
+    return _read_only(Gx, Gy, np.hypot(Gx, Gy))
+
+@functools.lru_cache(maxsize=64)
+def _cached_scharr_kernel(ksize, dtype):
+    Gx, Gy, G_magnitude = _cached_scharr_gradients(ksize, dtype)
+    return (Gx, Gy, G_magnitude) + _read_only(np.arctan2(Gy, Gx))
 
 # g_alpha = (alpha-unit vector) dot (gx, gy)
 #         = (cos a, sin a) dot (gx, gy)
 #         = cos a * gx + sin a * gy
 #         = (cos a * i + sin a * j)/(i**2 + j**2)
 # This overloaded function gives the image gradients in the direction of alpha
-def mygetScharrKernelAlpha(ksize=(3,3), alpha=0):
+def mygetScharrKernelAlpha(ksize=(3,3), alpha=0, dtype=np.float32, out=None):
     """
     Generate Scharr kernel in a specific direction (alpha) for any kernel size.
+    Results are cached per (ksize, alpha, dtype) and returned as a read-only array,
+    unless an out buffer of shape (ksize[1], ksize[0]) is given to write the kernel into.
     """
+    if out is None:
+        return _cached_scharr_kernel_alpha(tuple(ksize), float(alpha), np.dtype(dtype))
+    Gx, Gy, _ = _cached_scharr_gradients(tuple(ksize), np.dtype(dtype))
+    # out = cos a * Gx, then sin a * Gy accumulated on top of it
+    np.multiply(Gx, math.cos(alpha), out=out)
+    out += math.sin(alpha) * Gy
+    return out
+
+@functools.lru_cache(maxsize=64)
+def _cached_scharr_kernel_alpha(ksize, alpha, dtype):
+    Gx, Gy, _ = _cached_scharr_gradients(ksize, dtype)
+    # Python float weights so a float32 kernel is not promoted to float64
+    G_alpha, = _read_only(math.cos(alpha) * Gx + math.sin(alpha) * Gy)
+    return G_alpha
+
+# cached kernels are shared between callers, so they must not be modified in place
+def _read_only(*arrays):
+    for arr in arrays:
+        arr.setflags(write=False)
+    return arrays
+
+# Gx and Gy written straight into the given (or freshly allocated) buffers
+def _scharr_gradients(ksize, dtype=np.float32, out_Gx=None, out_Gy=None):
+    Gx = np.empty((ksize[1], ksize[0]), dtype=dtype) if out_Gx is None else out_Gx
+    Gy = np.empty((ksize[1], ksize[0]), dtype=dtype) if out_Gy is None else out_Gy
+    if njit is not None:
+        _scharr_numba((ksize[1]-1)/2, (ksize[0]-1)/2, Gx, Gy)
+        return Gx, Gy
+    i, j, dist_squared = _scharr_offsets(ksize, dtype)
+    # Scharr uses optimized weighting based on Fourier domain optimization
+    # For generalization, we use a modified approach that approximates Scharr behavior
+    weight = 1.0 / (1.0 + dist_squared)  # Optimized weighting
+    scale = np.divide(weight, dist_squared, out=np.zeros_like(weight), where=dist_squared != 0)
+    np.multiply(i, scale, out=Gx)
+    np.multiply(j, scale, out=Gy)
+    return Gx, Gy
+
+if njit is not None:
+    # fills Gx and Gy in one compiled loop nest, rows split across threads
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _scharr_numba(center_x, center_y, Gx, Gy):
+        for y in prange(Gx.shape[0]):
+            j = y - center_y
+            for x in range(Gx.shape[1]):
+                i = x - center_x
+                dist_squared = i*i + j*j
+                if dist_squared != 0:
+                    # weight / dist_squared with weight = 1 / (1 + dist_squared), folded into one division
+                    scale = 1.0 / ((1.0 + dist_squared) * dist_squared)
+                    Gx[y, x] = i * scale
+                    Gy[y, x] = j * scale
+                else:
+                    Gx[y, x] = 0.0
+                    Gy[y, x] = 0.0
+
+# (x, y) offsets of every kernel cell from the center, as a row (i) and a column (j)
+# that broadcast to a ksize[1] x ksize[0] grid, plus their squared distance
+def _scharr_offsets(ksize, dtype=np.float32):
     center_y = (ksize[0]-1)/2
     center_x = (ksize[1]-1)/2
-    G_alpha = []
-    
-    for y in range(ksize[1]):  # Note: using ksize[1] for y range like Sobel
-        row_alpha = []
-        j = y - center_y
-        for x in range(ksize[0]):  # Note: using ksize[0] for x range like Sobel
-            i = x - center_x
-            dist_squared = i**2 + j**2
-            if dist_squared != 0:
-                # Scharr optimized weighting
-                weight = 1.0 / (1.0 + dist_squared)
-                Gij_alpha = (np.cos(alpha) * i + np.sin(alpha) * j) * weight / dist_squared
-            else:
-                Gij_alpha = 0
-            row_alpha.append(Gij_alpha)
-        G_alpha.append(row_alpha)
-    return np.array(G_alpha)
+    j = np.arange(ksize[1], dtype=dtype)[:, None] - center_y  # Note: using ksize[1] for y range like Sobel
+    i = np.arange(ksize[0], dtype=dtype)[None, :] - center_x  # Note: using ksize[0] for x range like Sobel
+    return i, j, i**2 + j**2
 
 if __name__ == "__main__":
     alpha = math.pi/3
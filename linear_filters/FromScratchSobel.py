@@ -9,40 +9,19 @@ class FromScratchSobel():
             self.sobel_operator = mygetSobelKernelAlpha(ksize, alpha)
         else:
             self.Gx, self.Gy, self.G_magnitude, self.G_theta = mygetSobelKernel(ksize)
-            self.sobel_operator = mygetSobelKernelAlpha(ksize, alpha=np.atan2(dy, dx))
+            self.sobel_operator = mygetSobelKernelAlpha(ksize, alpha=math.atan2(dy, dx))
 
 # Sobel operator, defined for just alpha=0 (x-direction) and alpha=math.pi/2 (y-direction)
 def mygetSobelKernel(ksize=(3,3)):
-    center_y = (ksize[0]-1)/2
-    center_x = (ksize[1]-1)/2
-    Gx = []
-    Gy = []
-    G_magnitude = []
-    G_angle = []
-    for y in range(ksize[1]):
-        rowx = []
-        rowy = []
-        rowmag = []
-        rowangle = []
-        j = y-center_y
-        for x in range(ksize[0]):
-            i = x-center_x
-            dist_squared = i**2 + j**2
-            if dist_squared != 0:
-                Gx_ij = i/dist_squared
-                Gy_ij = j/dist_squared
-            else:
-                Gx_ij = 0
-                Gy_ij = 0
-            rowx.append(Gx_ij)
-            rowy.append(Gy_ij)
-            rowmag.append((Gx_ij**2 + Gy_ij**2)**0.5)
-            rowangle.append(np.atan2(Gy_ij, Gx_ij))
-        Gx.append(rowx)
-        Gy.append(rowy)
-        G_magnitude.append(rowmag)
-        G_angle.append(rowangle)
-    return np.array(Gx), np.array(Gy), np.array(G_magnitude), np.array(G_angle)
+    i, j, dist_squared = _sobel_offsets(ksize)
+    nonzero = dist_squared != 0
+    safe_dist_squared = np.where(nonzero, dist_squared, 1)
+    Gx = np.where(nonzero, i/safe_dist_squared, 0.0)
+    Gy = np.where(nonzero, j/safe_dist_squared, 0.0)
+    # one ufunc call over the whole kernel instead of a scalar **0.5 / atan2 per cell
+    G_magnitude = np.hypot(Gx, Gy)
+    G_angle = np.arctan2(Gy, Gx)
+    return Gx, Gy, G_magnitude, G_angle
 
 # g_alpha = (alpha-unit vector) dot (gx, gy)
 #         = (cos a, sin a) dot (gx, gy)
@@ -50,22 +29,22 @@ def mygetSobelKernel(ksize=(3,3)):
 #         = (cos a * i + sin a * j)/(i**2 + j**2)
 # This overloaded function gives the image gradients in the direction of alpha
 def mygetSobelKernelAlpha(ksize=(3,3), alpha=0):
+    i, j, dist_squared = _sobel_offsets(ksize)
+    nonzero = dist_squared != 0
+    safe_dist_squared = np.where(nonzero, dist_squared, 1)
+    # trig of alpha once, as Python floats that broadcast as plain constants
+    cos_alpha = math.cos(alpha)
+    sin_alpha = math.sin(alpha)
+    return np.where(nonzero, (cos_alpha * i + sin_alpha * j)/safe_dist_squared, 0.0)
+
+# (x, y) offsets of every kernel cell from the center, as a row (i) and a column (j)
+# that broadcast to a ksize[1] x ksize[0] grid, plus their squared distance
+def _sobel_offsets(ksize):
     center_y = (ksize[0]-1)/2
     center_x = (ksize[1]-1)/2
-    G_alpha = []
-    for y in range(ksize[1]):
-        row_alpha = []
-        j = y-center_y
-        for x in range(ksize[0]):
-            i = x-center_x
-            dist_squared = i**2 + j**2
-            if dist_squared != 0:
-                Gij_alpha = (np.cos(alpha) * i + np.sin(alpha) * j)/dist_squared
-            else:
-                Gij_alpha = 0
-            row_alpha.append(Gij_alpha)
-        G_alpha.append(row_alpha)
-    return np.array(G_alpha)
+    j = np.arange(ksize[1])[:, None] - center_y
+    i = np.arange(ksize[0])[None, :] - center_x
+    return i, j, i**2 + j**2
 
 if __name__ == "__main__":
     alpha = math.pi/3
@@ -17,34 +17,25 @@ class FromScratchPanoramaStitcher:
         self.panorama = None
         self.is_first_frame = True
     
-    def simple_homography(self, matches, kp1, kp2):
+    def simple_homography(self, matches, kp1_xy, kp2_xy):
         """Simple homography estimation using least squares"""
         if len(matches) < 4:
             return None
         
-        # Get matched points
-        src_pts = []
-        dst_pts = []
-        
-        for i, j in matches[:20]:  # Use best 20 matches
-            src_pts.append([kp1[i]['x'], kp1[i]['y']])
-            dst_pts.append([kp2[j]['x'], kp2[j]['y']])
-        
-        src_pts = np.array(src_pts, dtype=np.float32)
-        dst_pts = np.array(dst_pts, dtype=np.float32)
+        # Get matched points: one gather per image from the (K, 2) keypoint coordinates
+        best = matches[:20]  # Use best 20 matches
+        src_pts = kp1_xy[best[:, 0]]
+        dst_pts = kp2_xy[best[:, 1]]
         
         # Use OpenCV's homography for simplicity
-        if len(src_pts) >= 4:
-            H, _ = cv2.findHomography(src_pts, dst_pts, cv2.RANSAC)
-            return H
-        
-        return None
+        H, _ = cv2.findHomography(src_pts, dst_pts, cv2.RANSAC)
+        return H
     
     def stitch_images(self, img1, img2):
         """Stitch two images using from-scratch ORB"""
         # Detect features
-        kp1 = self.orb.detect_and_compute(img1)
-        kp2 = self.orb.detect_and_compute(img2)
+        kp1, kp1_xy = self.orb.detect_and_compute(img1, return_xy=True)
+        kp2, kp2_xy = self.orb.detect_and_compute(img2, return_xy=True)
         
         if len(kp1) < 10 or len(kp2) < 10:
             return img2
@@ -56,7 +47,7 @@ class FromScratchPanoramaStitcher:
             return img2
         
         # Find homography
-        H = self.simple_homography(matches, kp1, kp2)
+        H = self.simple_homography(matches, kp1_xy, kp2_xy)
         
         if H is None:
             return img2
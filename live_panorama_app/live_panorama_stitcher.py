@@ -1,15 +1,23 @@
+import threading
 import numpy as np
 import cv2
 
 class SimplePanoramaStitcher:
-    def __init__(self):
+    def __init__(self, canvas_scale=(4, 2)):
         self.orb = cv2.ORB_create()
         self.matcher = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
         self.panorama = None
         self.is_first_frame = True
+        # fixed canvas, canvas_scale = (width, height) in frames, allocated on the first frame
+        self.canvas_scale = canvas_scale
+        self.canvas = None
+        # H_world maps the last frame into canvas coordinates
+        self.H_world = np.eye(3)
+        self.last_frame = None
+        self.bounds = None
     
-    def detect_and_match(self, img1, img2):
-        """Detect keypoints and match between two images"""
+    def detect_and_match(self, img1, img2, max_matches=50):
+        """Detect keypoints and match between two images, keeping the max_matches best matches"""
         kp1, des1 = self.orb.detectAndCompute(img1, None)
         kp2, des2 = self.orb.detectAndCompute(img2, None)
         
@@ -17,7 +25,13 @@ class SimplePanoramaStitcher:
             return None, None, None
         
         matches = self.matcher.match(des1, des2)
-        matches = sorted(matches, key=lambda x: x.distance)
+        if len(matches) > max_matches:
+            # select the best max_matches in O(M), then sort only those
+            dists = np.fromiter((m.distance for m in matches), dtype=np.float32, count=len(matches))
+            best = np.argpartition(dists, max_matches)[:max_matches]
+            matches = [matches[i] for i in best[np.argsort(dists[best], kind='stable')]]
+        else:
+            matches = sorted(matches, key=lambda x: x.distance)
         
         return kp1, kp2, matches
     
@@ -87,16 +101,81 @@ class SimplePanoramaStitcher:
         return result
     
     def add_frame(self, frame):
-        """Add a new frame to the panorama"""
+        """
+        Add a new frame to the panorama.
+        Only the new frame is warped, straight into the fixed canvas, so the per-frame cost
+        does not grow with the panorama. Frames that cannot be registered are skipped.
+        """
         if self.is_first_frame:
-            self.panorama = frame.copy()
+            h, w = frame.shape[:2]
+            cw, ch = w * self.canvas_scale[0], h * self.canvas_scale[1]
+            self.canvas = np.zeros((ch, cw) + frame.shape[2:], dtype=frame.dtype)
+            # first frame sits in the middle of the canvas
+            self.H_world = np.array([[1, 0, (cw - w) // 2], [0, 1, (ch - h) // 2], [0, 0, 1]], dtype=np.float64)
+            self.bounds = None
             self.is_first_frame = False
-            return self.panorama
-        
-        # Stitch with existing panorama
-        self.panorama = self.stitch_images(self.panorama, frame)
+        else:
+            # relative homography new frame -> last frame, chained onto last frame -> canvas
+            kp1, kp2, matches = self.detect_and_match(frame, self.last_frame)
+            if matches is None or len(matches) < 10:
+                return self.panorama
+            H_rel = self.find_homography(kp1, kp2, matches)
+            if H_rel is None:
+                return self.panorama
+            self.H_world = self.H_world @ H_rel
+        
+        ch, cw = self.canvas.shape[:2]
+        # composite in place: canvas pixels outside the warped frame are left untouched
+        cv2.warpPerspective(frame, self.H_world, (cw, ch), dst=self.canvas,
+                            borderMode=cv2.BORDER_TRANSPARENT)
+        self.last_frame = frame
+        
+        # grow the covered region by the new frame's footprint, clipped to the canvas
+        h, w = frame.shape[:2]
+        corners = np.float32([[0, 0], [w, 0], [w, h], [0, h]]).reshape(-1, 1, 2)
+        corners = cv2.perspectiveTransform(corners, self.H_world).reshape(-1, 2)
+        x0, y0 = np.floor(corners.min(axis=0)).astype(int).tolist()
+        x1, y1 = np.ceil(corners.max(axis=0)).astype(int).tolist()
+        if self.bounds is not None:
+            x0, y0 = min(x0, self.bounds[0]), min(y0, self.bounds[1])
+            x1, y1 = max(x1, self.bounds[2]), max(y1, self.bounds[3])
+        self.bounds = (max(x0, 0), max(y0, 0), min(x1, cw), min(y1, ch))
+        
+        # the panorama is a view of the covered part of the canvas, no copy
+        self.panorama = self.canvas[self.bounds[1]:self.bounds[3], self.bounds[0]:self.bounds[2]]
         return self.panorama
 
+class FrameReader:
+    """Reads camera frames on a background thread, keeping only the latest one"""
+    def __init__(self, cap):
+        self.cap = cap
+        self.lock = threading.Lock()
+        self.latest = None
+        self.frame_id = 0
+        self.running = True
+        self.thread = threading.Thread(target=self._reader, daemon=True)
+        self.thread.start()
+    
+    def _reader(self):
+        # cap.read() blocks for the next frame, so it runs here instead of stalling the UI loop
+        while self.running:
+            ret, frame = self.cap.read()
+            if not ret:
+                self.running = False
+                break
+            with self.lock:
+                self.latest = frame
+                self.frame_id += 1
+    
+    def read(self):
+        """(frame_id, latest frame); the frame is None until the first one arrives"""
+        with self.lock:
+            return self.frame_id, self.latest
+    
+    def stop(self):
+        self.running = False
+        self.thread.join()
+
 def main():
     """Main live panorama stitching application"""
     print("Live Panorama Stitcher")
@@ -112,16 +191,16 @@ def main():
         print("Error: Could not open camera")
         return
     
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        
-        # Convert to grayscale for processing
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    reader = FrameReader(cap)
+    shown_id = 0
+    
+    while reader.running:
+        frame_id, frame = reader.read()
         
-        # Display current frame
-        cv2.imshow('Camera Feed (Press SPACE to add to panorama)', frame)
+        # Display current frame, only when the reader has a new one
+        if frame is not None and frame_id != shown_id:
+            cv2.imshow('Camera Feed (Press SPACE to add to panorama)', frame)
+            shown_id = frame_id
         
         # Display current panorama if it exists
         if stitcher.panorama is not None:
@@ -137,8 +216,10 @@ def main():
         
         key = cv2.waitKey(1) & 0xFF
         
-        if key == ord(' '):  # Space key - capture frame
+        if key == ord(' ') and frame is not None:  # Space key - capture frame
             print("Adding frame to panorama...")
+            # Convert to grayscale for processing; cvtColor makes a new array, so the reader's frame is never shared
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
             result = stitcher.add_frame(gray)
             print(f"Panorama size: {result.shape}")
         
@@ -151,6 +232,7 @@ def main():
         elif key == ord('q'):  # Quit
             break
     
+    reader.stop()
     cap.release()
     cv2.destroyAllWindows()
     
@@ -1,53 +1,176 @@
 import numpy as np
+from scipy import ndimage
+
+try:
+    from numba import njit, prange
+except ImportError:
+    # numba is optional here, erode and dilate fall back to bit-packed NumPy (SWAR) passes
+    njit = None
+
+# Default structuring elements, converted once at import; read-only since every call shares them
+_CROSS_SE = np.array([[0,1,0],[1,1,1],[0,1,0]], dtype=bool)
+_SQUARE_SE = np.ones((3, 3), dtype=bool)
+_CROSS_SE.setflags(write=False)
+_SQUARE_SE.setflags(write=False)
 
 # 1. Erosion (each center pixel stays only if the structuring element completely lies in white pixels)
-def erode(img, structuring_element=[[0,1,0],[1,1,1],[0,1,0]]):
-    H, W = img.shape
-    se_h, se_w = len(structuring_element), len(structuring_element[0])
-    pad_h, pad_w = se_h // 2, se_w // 2
+def erode(img, structuring_element=None):
+    se = _as_se(structuring_element, _CROSS_SE)
+    return _morph(img, se, erosion=True, dtype=img.dtype)
 
-    # Pad the image to handle border pixels
-    padded_img = np.pad(img, ((pad_h, pad_h), (pad_w, pad_w)), mode='constant', constant_values=0)
-    eroded_img = np.zeros_like(img)
+# 2. Dilation (each center pixel stays only if the structuring element intersects a white pixel)
+def dilate(img, structuring_element=None):
+    se = _as_se(structuring_element, _CROSS_SE)
+    return _morph(img, se, erosion=False, dtype=img.dtype)
 
-    for i in range(H):
-        for j in range(W):
-            # Extract the region of interest
-            roi = padded_img[i:i+se_h, j:j+se_w]
-            # Apply erosion: check if structuring element fits completely
-            if np.array_equal(roi & structuring_element, structuring_element):
-                eroded_img[i, j] = 255  # Set pixel to white
-            else:
-                eroded_img[i, j] = 0  # Set pixel to black
+# erosion (or dilation) of img, any pixel > 0 counting as white; the result is a 255/0 image of the
+# given dtype, or a boolean image for dtype=bool
+def _morph(img, se, erosion, dtype):
+    if _is_rectangle(se):
+        binary_op = ndimage.binary_erosion if erosion else ndimage.binary_dilation
+        result = _separable(binary_op, img > 0, se.shape, reflected=not erosion)
+    elif njit is not None:
+        # the kernels binarize on the fly and write 255/0 (True/False for a boolean out) directly
+        out = np.empty(img.shape, dtype=dtype)
+        (_erode_numba if erosion else _dilate_numba)(img, _se_offsets(se), out)
+        return out
+    else:
+        # Apply erosion: check if structuring element fits completely, i.e. the image shifted by every
+        # offset under it is white; ANDed 64 pixels per uint64 word (ORed for dilation: any offset is white)
+        W = img.shape[1]
+        result = _unpack(_swar_morph(_pack(img), se, erosion, W), W)
+    return result if dtype == bool else _to_image(result, dtype)
 
-    return eroded_img
+# opening/closing as one pass pair: the intermediate stays boolean (bit-packed on the SWAR path)
+# instead of going through a 0/255 image that the second pass has to binarize again
+def _morph_pair(img, se, first, second):
+    if njit is None and not _is_rectangle(se):
+        W = img.shape[1]
+        words = _swar_morph(_pack(img), se, first == "erode", W)
+        words = _swar_morph(words, se, second == "erode", W)
+        return _to_image(_unpack(words, W), img.dtype)
+    mask = _morph(img, se, first == "erode", dtype=bool)
+    return _morph(mask, se, second == "erode", dtype=img.dtype)
 
-# 2. Dilation (each center pixel stays only if the structuring element intersects a white pixel)
-def dilate(img, structuring_element=[[0,1,0],[1,1,1],[0,1,0]]):
+def _to_image(mask, dtype):
+    return np.where(mask, 255, 0).astype(dtype)
+
+# structuring element as a boolean array (nested lists and 0/1 arrays are still accepted)
+def _as_se(structuring_element, default):
+    if structuring_element is None:
+        return default
+    return np.asarray(structuring_element, dtype=bool)
+
+# (dy, dx) of every active cell of se from its se_h//2, se_w//2 center; precomputed for the default elements
+def _se_offsets(se):
+    if se is _CROSS_SE:
+        return _CROSS_OFFSETS
+    if se is _SQUARE_SE:
+        return _SQUARE_OFFSETS
+    return np.argwhere(se) - np.array(se.shape) // 2
+
+_CROSS_OFFSETS = np.argwhere(_CROSS_SE) - 1
+_SQUARE_OFFSETS = np.argwhere(_SQUARE_SE) - 1
+
+# all-ones se_h x se_w elements are separable: a column pass of height se_h then a row pass of width se_w
+# (2k instead of k^2 tests per pixel), both done by SciPy's C binary morphology with the same zero border
+def _is_rectangle(se):
+    return se.size > 0 and bool(se.all())
+
+def _separable(binary_op, mask, se_shape, reflected=False):
+    se_h, se_w = se_shape
+    # SciPy's dilation reflects the element, which moves the center of even-sized ones by one pixel;
+    # shift it back so both ops use the same se_h//2, se_w//2 center as the other paths
+    origin_h = -1 if reflected and se_h % 2 == 0 else 0
+    origin_w = -1 if reflected and se_w % 2 == 0 else 0
+    columns = binary_op(mask, structure=np.ones((se_h, 1), dtype=bool), border_value=0, origin=(origin_h, 0))
+    return binary_op(columns, structure=np.ones((1, se_w), dtype=bool), border_value=0, origin=(0, origin_w))
+
+# Binary morphology on bit-packed rows: every row of the binarized image becomes uint64 words holding
+# 64 pixels each (pixel x is bit x % 64 of word x // 64), so one AND/OR combines 64 pixels
+def _pack(img):
     H, W = img.shape
-    se_h, se_w = len(structuring_element), len(structuring_element[0])
-    pad_h, pad_w = se_h // 2, se_w // 2
+    bits = np.zeros((H, -(-W // 64) * 64), dtype=bool)
+    np.greater(img, 0, out=bits[:, :W])
+    return np.packbits(bits, axis=1, bitorder='little').view('<u8')
+
+def _unpack(words, W):
+    return np.unpackbits(words.view(np.uint8), axis=1, count=W, bitorder='little').view(bool)
+
+def _swar_morph(words, se, erosion, W):
+    result = np.full_like(words, np.uint64(0xFFFFFFFFFFFFFFFF)) if erosion else np.zeros_like(words)
+    # only the active cells of the element contribute: 5 shifted images for the cross, not 9
+    for dy, dx in _se_offsets(se):
+        shifted = _shift_bits(words, dy, dx)
+        if erosion:
+            result &= shifted
+        else:
+            result |= shifted
+    # the bits past column W must stay zero (outside the image) for a second pass over result
+    if W % 64:
+        result[:, -1] &= np.uint64((1 << (W % 64)) - 1)
+    return result
+
+# packed image whose pixel (i, x) is pixel (i + dy, x + dx) of words, with zeros coming in from outside
+# the image (the zero padding); the column shift carries bits across neighbouring words
+def _shift_bits(words, dy, dx):
+    H = words.shape[0]
+    rows = np.zeros_like(words)
+    if abs(dy) < H:
+        rows[max(0, -dy):H - max(0, dy)] = words[max(0, dy):H - max(0, -dy)]
+    q, r = divmod(dx, 64)
+    low = _shift_words(rows, q)
+    if r == 0:
+        return low
+    high = _shift_words(rows, q + 1)
+    return (low >> np.uint64(r)) | (high << np.uint64(64 - r))
 
-    # Pad the image to handle border pixels
-    padded_img = np.pad(img, ((pad_h, pad_h), (pad_w, pad_w)), mode='constant', constant_values=0)
-    dilated_img = np.zeros_like(img)
+# word w of the result is word w + q of words, zero where that is out of range
+def _shift_words(words, q):
+    n = words.shape[1]
+    shifted = np.zeros_like(words)
+    if abs(q) < n:
+        shifted[:, max(0, -q):n - max(0, q)] = words[:, max(0, q):n - max(0, -q)]
+    return shifted
 
-    for i in range(H):
-        for j in range(W):
-            # Extract the region of interest
-            roi = padded_img[i:i+se_h, j:j+se_w]
-            # Apply dilation: check if structuring element intersects
-            if np.any(roi & structuring_element):
-                dilated_img[i, j] = 255  # Set pixel to white
-            else:
-                dilated_img[i, j] = 0  # Set pixel to black
+if njit is not None:
+    # one output pixel at a time, stopping at the first active cell that decides it, rows split across threads;
+    # offsets lists only the active cells, so the cross costs at most 5 tests per pixel instead of 9.
+    # The image is read in place: neighbours outside it count as black, so no padded copy is made
+    @njit(parallel=True, cache=True, boundscheck=False)
+    def _erode_numba(img, offsets, out):
+        H, W = out.shape
+        for i in prange(H):
+            for j in range(W):
+                fits = True
+                for k in range(offsets.shape[0]):
+                    y = i + offsets[k, 0]
+                    x = j + offsets[k, 1]
+                    if y < 0 or y >= H or x < 0 or x >= W or not img[y, x] > 0:
+                        fits = False
+                        break
+                out[i, j] = 255 if fits else 0
 
-    return dilated_img
+    @njit(parallel=True, cache=True, boundscheck=False)
+    def _dilate_numba(img, offsets, out):
+        H, W = out.shape
+        for i in prange(H):
+            for j in range(W):
+                hit = False
+                for k in range(offsets.shape[0]):
+                    y = i + offsets[k, 0]
+                    x = j + offsets[k, 1]
+                    if 0 <= y < H and 0 <= x < W and img[y, x] > 0:
+                        hit = True
+                        break
+                out[i, j] = 255 if hit else 0
 
 # Opening removes noise but keeps the general shape by applying erosion then dilation
-def opening(img, structuring_element=[[1,1,1],[1,1,1],[1,1,1]]):
-    return dilate(erode(img, structuring_element), structuring_element)
+def opening(img, structuring_element=None):
+    se = _as_se(structuring_element, _SQUARE_SE)
+    return _morph_pair(img, se, "erode", "dilate")
 
 # Closing closes small gaps or holes by applying dilation then erosion
-def closing(img, structuring_element=[[1,1,1],[1,1,1],[1,1,1]]):
-    return erode(dilate(img, structuring_element), structuring_element)
\ No newline at end of file
+def closing(img, structuring_element=None):
+    se = _as_se(structuring_element, _SQUARE_SE)
+    return _morph_pair(img, se, "dilate", "erode")
@@ -1,5 +1,12 @@
+import math
 import numpy as np
 
+try:
+    from numba import njit, prange
+except ImportError:
+    # numba is optional here, apply_bilateral_filter falls back to the Python loops
+    njit = None
+
 # Median filter (takes medium of window)
 def apply_median_filter(img, kernel=(3,3)):
     kernel_height_halved = int((kernel[1]-1)/2)
@@ -7,27 +14,29 @@ def apply_median_filter(img, kernel=(3,3)):
     img = np.pad(img, ((kernel_height_halved, kernel_height_halved), 
                     (kernel_width_halved, kernel_width_halved)), 
                 mode='constant', constant_values=0)
-    convolution = []
-    img_height = img.shape[0]
-    img_width = img.shape[1]
-    # start at row kernel_height_halved, end at row img_height-kernel_height_halved
-    for i in range(kernel_height_halved, img_height-kernel_height_halved):
-        lst = []
-        # start at col kernel_width_halved, end at col img_width-kernel_height_halved
-        for j in range(kernel_width_halved, img_width-kernel_width_halved):
-            lst.append(np.median(img[i-kernel_height_halved:i+kernel_height_halved+1,
-                            j-kernel_width_halved:j+kernel_width_halved+1]))
-        convolution.append(lst)
-    return convolution
+    # every (2h+1)x(2w+1) window as a strided view, no copies until the reshape
+    windows = np.lib.stride_tricks.sliding_window_view(
+        img, (2*kernel_height_halved+1, 2*kernel_width_halved+1))
+    windows = windows.reshape(windows.shape[0], windows.shape[1], -1)
+    # window size is always odd, so the middle element after a partial sort is the median
+    mid = windows.shape[-1] // 2
+    return np.partition(windows, mid, axis=-1)[..., mid]
 
 
 # Bilateral Filter (smooths the image while respecting edges)
 def apply_bilateral_filter(img, kernel=(3,3), sigma_spatial=1, sigma_intensity=1):
     kernel_height_halved = int((kernel[1]-1)/2)
     kernel_width_halved = int((kernel[0]-1)/2)
+    # work in contiguous float32 throughout: half the bytes of float64 and twice the SIMD lanes
+    original_dtype = img.dtype
+    img = np.ascontiguousarray(img, dtype=np.float32)
     img = np.pad(img, ((kernel_height_halved, kernel_height_halved), 
                     (kernel_width_halved, kernel_width_halved)), 
                 mode='constant', constant_values=0)
+    # the spatial term only depends on the offset inside the window, so it is computed once
+    spatial_lut = spatial_weights(kernel_height_halved, kernel_width_halved, sigma_spatial)
+    if njit is not None:
+        return _cast_back(_bilateral_numba(img, spatial_lut, np.float32(sigma_intensity)), original_dtype)
     bilateral = []
     img_height = img.shape[0]
     img_width = img.shape[1]
@@ -36,30 +45,55 @@ def apply_bilateral_filter(img, kernel=(3,3), sigma_spatial=1, sigma_intensity=1
         lst = []
         # start at col kernel_width_halved, end at col img_width-kernel_height_halved
         for j in range(kernel_width_halved, img_width-kernel_width_halved):
-            lst.append(denoised_intensity(img,i,j,sigma_spatial,sigma_intensity,
+            lst.append(denoised_intensity(img,i,j,spatial_lut,sigma_intensity,
                                           startk=i-kernel_height_halved,
                                           endk=i+kernel_height_halved+1,
                                           startl=j-kernel_width_halved,
                                           endl=j+kernel_width_halved+1))
         bilateral.append(lst)
 
-    return bilateral
+    return _cast_back(np.array(bilateral, dtype=np.float32), original_dtype)
 
-# calculate the weighted intensity normalized (i.e. divided by sum of weights)
-def denoised_intensity(img, i, j, sigma_spatial, sigma_intensity, startk, endk, startl, endl):
-    sum_ij = 0
-    sum_weights = 0
-    for k in range(startk, endk):
-        for l in range(startl, endl):
-            weight_kl = weight(img, i, j, k, l, sigma_spatial, sigma_intensity)
-            sum_ij += img[k][l] * weight_kl
-            sum_weights += weight_kl
-    return sum_ij/sum_weights
+# return the filtered float32 image in the caller's dtype, rounding and clipping integer images
+def _cast_back(img, dtype):
+    if np.issubdtype(dtype, np.integer):
+        info = np.iinfo(dtype)
+        img = np.clip(np.rint(img), info.min, info.max)
+    return img.astype(dtype, copy=False)
 
-# weight assigned for pixel (k, l) to denoise pixel (i, j)
-def weight(img, i, j, k, l, sigma_spatial, sigma_intensity):
+if njit is not None:
+    # denoised_intensity inlined into one compiled loop nest, rows split across threads
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _bilateral_numba(img, spatial_lut, sigma_intensity):
+        kernel_height_halved = spatial_lut.shape[0] // 2
+        kernel_width_halved = spatial_lut.shape[1] // 2
+        out_height = img.shape[0] - 2*kernel_height_halved
+        out_width = img.shape[1] - 2*kernel_width_halved
+        bilateral = np.empty((out_height, out_width), dtype=np.float32)
+        inv_2_sigma_intensity_sq = np.float32(0.5) / (sigma_intensity * sigma_intensity)
+        for y in prange(out_height):
+            for x in range(out_width):
+                center = img[y+kernel_height_halved, x+kernel_width_halved]
+                sum_ij = np.float32(0.0)
+                sum_weights = np.float32(0.0)
+                for dy in range(spatial_lut.shape[0]):
+                    for dx in range(spatial_lut.shape[1]):
+                        intensity_diff = center - img[y+dy, x+dx]
+                        weight_kl = spatial_lut[dy, dx] * math.exp(-intensity_diff**2 * inv_2_sigma_intensity_sq)
+                        sum_ij += img[y+dy, x+dx] * weight_kl
+                        sum_weights += weight_kl
+                bilateral[y, x] = sum_ij / sum_weights
+        return bilateral
+
+# calculate the weighted intensity normalized (i.e. divided by sum of weights)
+def denoised_intensity(img, i, j, spatial_lut, sigma_intensity, startk, endk, startl, endl):
+    patch = img[startk:endk, startl:endl]
     # is never 0 as you cannot have input -inf
-    intensity_diff = img[i][j] - img[k][l]
-    spatial_term = -((i - k)**2 + (j - l)**2) / (2 * sigma_spatial**2)
-    intensity_term = -(intensity_diff**2) / (2 * sigma_intensity**2)
-    return np.exp(spatial_term + intensity_term)
+    weights = spatial_lut * np.exp(-(patch - img[i][j])**2 / (2 * sigma_intensity**2))
+    return (weights * patch).sum() / weights.sum()
+
+# spatial part of the weight for every (k, l) offset from the pixel being denoised
+def spatial_weights(kernel_height_halved, kernel_width_halved, sigma_spatial):
+    dy = np.arange(-kernel_height_halved, kernel_height_halved+1)[:, None]
+    dx = np.arange(-kernel_width_halved, kernel_width_halved+1)[None, :]
+    return np.exp(-(dy*dy + dx*dx) / (2 * sigma_spatial**2)).astype(np.float32)
\ No newline at end of file
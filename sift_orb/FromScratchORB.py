@@ -85,11 +85,16 @@ class FromScratchORB:
         
         return np.array(desc, dtype=np.uint8)
     
-    def detect_and_compute(self, img):
-        """Main ORB pipeline"""
+    def detect_and_compute(self, img, return_xy=False):
+        """
+        Main ORB pipeline.
+        With return_xy=True also returns the keypoint coordinates as a (K, 2) float32 array,
+        row k being (x, y) of feature k, for vectorized use downstream.
+        """
         img = cv2.GaussianBlur(img, (3, 3), 0)
         keypoints_xy = self.fast_keypoints(img)
         orb_features = []
+        kept_xy = []
         
         for (x, y) in keypoints_xy:
             angle = self.compute_orientation(img, x, y)
@@ -99,7 +104,10 @@ class FromScratchORB:
             orb_features.append({
                 'x': x, 'y': y, 'angle': angle, 'descriptor': desc
             })
+            kept_xy.append((x, y))
         
+        if return_xy:
+            return orb_features, np.array(kept_xy, dtype=np.float32).reshape(-1, 2)
         return orb_features
 
 # Utility functions for matching
@@ -108,7 +116,10 @@ def hamming_distance(desc1, desc2):
     return np.count_nonzero(desc1 != desc2)
 
 def match_features(features1, features2, max_dist=30):
-    """Match features between two images"""
+    """
+    Match features between two images.
+    Returns an (M, 2) integer array of (index in features1, index in features2) pairs.
+    """
     matches = []
     for i, f1 in enumerate(features1):
         best_match = None
@@ -122,7 +133,7 @@ def match_features(features1, features2, max_dist=30):
                         best_match = (i, j)
         if best_score < max_dist:
             matches.append(best_match)
-    return matches
+    return np.array(matches, dtype=np.intp).reshape(-1, 2)
 
 if __name__ == "__main__":
     # Test both algorithms